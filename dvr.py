@@ -1,23 +1,22 @@
-from collections import defaultdict, deque
 import sys
 import threading
 import math
-import time
-from copy import deepcopy
+from array import array
 
 # Router Class that contains all relevant information about a router instance
 #
 class Router:
     # Constructor
-    def __init__(self, name) -> None:
+    def __init__(self, name, router_id, no_of_routers) -> None:
         # Unique name for the router
         self.name = name
 
-        # Shared queue
-        self.queue = deque()
+        # Unique integer id for the router, assigned in the order of the input file
+        self.id = router_id
 
-        # Lock for shared queue
-        self.queue_lock = threading.Lock()
+        # Shared queue, with one slot per router indexed by the id of the router that posted the message
+        # Each neighbour writes only to its own slot, so no lock is needed
+        self.slots = [None] * no_of_routers
 
         # Number of iterations
         self.iterations = 0
@@ -25,13 +24,17 @@ class Router:
         # List of neighbour routers
         self.neighbours = []
 
-        # Map that stores router name as key and iteration number when it was appended as value
-        self.appended_at = defaultdict(lambda: None)
+        # List indexed by router id that stores the iteration number when the entry was appended
+        self.appended_at = [None] * no_of_routers
 
-        # Routing Table, a defaultdict that maps a dest router to its [<cost>, <path>] value
-        # If missing key, it gives default value of [math.inf, '[no path]']
-        self.table = defaultdict(lambda: [math.inf, '[no path]'])
-        self.table[name] = 0, 'None' # Distance to itself is 0
+        # Routing Table, stored as two parallel lists indexed by the id of the dest router
+        # cost holds the cost to reach each router, math.inf if it is unreachable
+        # Costs are stored as doubles, so they are only exact up to 2**53; input_parser rejects link
+        # costs whose sum exceeds MAX_TOTAL_COST, which keeps every computed cost below that limit
+        # next_hop holds the path used to reach each router, '[no path]' if it is unreachable
+        self.cost = array('d', [math.inf] * no_of_routers)
+        self.next_hop = ['[no path]'] * no_of_routers
+        self.cost[router_id], self.next_hop[router_id] = 0, 'None' # Distance to itself is 0
 
 
     # Method to print Router object as a String
@@ -43,18 +46,17 @@ class Router:
             "Routing Table: {",  # Start of the routing table section
         ]
 
-        for router_name in sorted(routers):
-            # Generates all default values for whatever doesn't exist (since we use defaultdict)
-            _, _ = self.table[router_name]
-        
-        # Iterate over the keys of the routing table and append router information to the string
-        for router_name in sorted(self.table.keys()):
-            cost = self.table[router_name][0]     # Cost to reach the router
+        # Iterate over all routers in sorted order of name and append router information to the string
+        # i is the index of the router in the routing table
+        for router_name, i in ROUTERS_SORTED:
+            cost = self.cost[i]                   # Cost to reach the router
+            # Costs are stored as exact whole-number doubles, print finite ones as ints like in the input file
+            cost = cost if cost == math.inf else int(cost)
             x = "   "                             # Indentation string
             # Add "*" if the router was appended in the current iteration, else add " "
-            x += "*" if self.appended_at[router_name] == self.iterations else " "
+            x += "*" if self.appended_at[i] == self.iterations else " "
             # Append router information to the string
-            s.append(f"{x}{router_name}: {cost:<10} via: {self.table[router_name][1]}")
+            s.append(f"{x}{router_name}: {str(cost).ljust(10)} via: {self.next_hop[i]}")
 
         s.append("}")    # End of the routing table section
         return "\n".join(s)   # Join the lines with newline characters and return the string
@@ -68,100 +70,149 @@ class Router:
 # Method that parses the input.txt file and populates the routers dict
 def input_parser(filename):
     try:
-        with open(filename, 'r') as f:
-            lines = f.readlines()  # Read all lines from the input file
+        with open(filename, 'rb') as f:
+            lines = f.read().splitlines()  # Read all lines from the input file as bytes
 
             no_of_routers = int(lines[0])  # Extract the number of routers from the first line
 
-            routerNames = lines[1].split()  # Extract the names of routers from the second line
+            routerNames = lines[1].decode().split()  # Extract the names of routers from the second line
             # Create Router objects for each router name and add them to the routers dictionary
-            for name in routerNames:
-                routers[name] = Router(name)
+            for router_id, name in enumerate(routerNames):
+                routers[name] = Router(name, router_id, len(routerNames))
             
             lines = lines[2:]  # Remove the first two lines (number of routers and router names)
             # Remove the last line if it contains "EOF" (not necessary for parsing)
-            lines.pop() if "EOF" in lines[-1] else None
+            lines.pop() if b"EOF" in lines[-1] else None
+
+            # Sum of all link costs parsed so far, checked against MAX_TOTAL_COST after each link
+            total_cost = 0
 
             # Iterate over the remaining lines to parse connections and costs between routers
             for line in lines:
                 # Split the line by whitespace and extract source, destination, and cost
-                src, dest, cost = map(
-                    lambda x: int(x[1]) if x[0] == 2 else x[1], enumerate(line.split())
-                )
+                src, dest, cost = line.split()
+                src, dest, cost = src.decode(), dest.decode(), int(cost)
+                # Raise a SyntaxError for a link from a router to itself, its distance to itself is always 0
+                if src == dest:
+                    raise SyntaxError(f'Link from router {src} to itself is not allowed.')
+                total_cost += abs(cost)
+                # Raise a SyntaxError if the costs could stop being exact once stored and added as doubles
+                if total_cost > MAX_TOTAL_COST:
+                    raise SyntaxError(f'Sum of link costs must not exceed {MAX_TOTAL_COST}.')
 
                 # Add the destination as a neighbor of the source router
                 routers[src].add_neighbours(dest)
                 # Update the routing table of the source router with the cost and next hop for the destination
-                routers[src].table[dest][0] = cost
-                routers[src].table[dest][1] = dest
+                routers[src].cost[routers[dest].id] = cost
+                routers[src].next_hop[routers[dest].id] = dest
 
                 # Add the source as a neighbor of the destination router
                 routers[dest].add_neighbours(src)
                 # Update the routing table of the destination router with the cost and next hop for the source
-                routers[dest].table[src][0] = cost
-                routers[dest].table[src][1] = src
-    except:
+                routers[dest].cost[routers[src].id] = cost
+                routers[dest].next_hop[routers[src].id] = src
+
+            # Router names and ids don't change after parsing, so sort them once
+            ROUTERS_SORTED[:] = sorted((name, router.id) for name, router in routers.items())
+    except (ValueError, IndexError, KeyError, OverflowError):
         # Raise a SyntaxError if there is an issue with the input file
+        # (bad number, missing line or field, link to an unknown router, or a cost too large to store)
         raise SyntaxError('Check input file for Syntax error.')
     
 
-# Method to run after creating a thread
-def threaded(router_name):
+# Method to run after creating a thread, the thread lives for all iterations of updation
+def threaded(router_name, posted, updated):
     # Get the router object corresponding to the given router_name
     router = routers[router_name]
-    # Add the routing table and router name of each neighbor to the queue of the router
-    add_to_queue(router_name)
 
-    # Wait until the queue has messages for all neighbors
-    while True:
-        if len(router.queue) == len(router.neighbours):
-            break
-    
+    try:
+        for _ in range(NO_OF_ITERATIONS):
+            # Add the routing table and router name of each neighbor to the queue of the router
+            add_to_queue(router_name)
+
+            # Wait until every router has posted its table, so the queue has messages for all neighbors
+            posted.wait()
+
+            update_table(router)
+
+            # Wait until every router has updated its table, so the main thread can print them
+            updated.wait()
+    except threading.BrokenBarrierError:
+        # Another thread failed and aborted the barriers, so stop this router
+        return
+    except Exception:
+        # Abort both barriers so the other threads don't wait forever for this router
+        posted.abort()
+        updated.abort()
+        raise
+
+# Method that updates the routing table of a router from the messages in its queue
+def update_table(router):
     # Implementing the Bellman-Ford Equation
 
     # Increase the iteration value for the router
     router.iterations += 1
 
-    # Create a deepcopy of the router's routing table
-    table_copy = deepcopy(router.table)
-
-    # Iterate over messages in the router's queue
-    for table, name in router.queue:
+    # Scratch buffers holding the new costs and paths, filled once from the router's routing table
+    new_cost = array('d', router.cost)
+    new_next = list(router.next_hop)
+
+    # Iterate over messages in the router's queue, the slot index is the id of the neighbour that sent it
+    for name_id, table in enumerate(router.slots):
+        if table is None:
+            continue
+        # Cost to reach the neighbour and the path used for it, the same for every router in the message
+        hop = router.cost[name_id]
+        via = new_next[name_id]
         # Iterate over all routers in the network
-        for eachRouter in routers:
+        for eachRouter, cost in enumerate(table):
             # Calculate the new cost to reach each router based on received message
-            val = table[eachRouter][0] + router.table[name][0]
+            val = cost + hop
             # Update the least-costly path if a better path is found
-            if val < table_copy[eachRouter][0]:
-                table_copy[eachRouter][0] = val
-                table_copy[eachRouter][1] = table_copy[name][1]
+            if val < new_cost[eachRouter]:
+                new_cost[eachRouter] = val
+                new_next[eachRouter] = via
 
     # Update the router's routing table and appended_at values if changes were made
-    for key, value in table_copy.items():
-        if router.table[key] != value:
-            router.table[key] = value
-            router.appended_at[key] = router.iterations
+    for i in range(len(new_cost)):
+        if new_cost[i] != router.cost[i] or new_next[i] != router.next_hop[i]:
+            router.cost[i] = new_cost[i]
+            router.next_hop[i] = new_next[i]
+            router.appended_at[i] = router.iterations
 
     # Clear the router's queue
-    router.queue.clear()
+    router.slots = [None] * len(router.slots)
 
-    # Sleep for 2 seconds before exiting the thread
-    time.sleep(2)
-
-# Append router table, router name of each neighbour in the queue of the router
+# Post router table, router name to the queue of each neighbour of the router
 def add_to_queue(router_name):
+    router = routers[router_name]
+    # The message is a snapshot of the costs in the routing table of the router_name's router
+    # Neighbours only read it, so the same snapshot is shared by all of them
+    snapshot = array('d', router.cost)
     # Iterate over the neighbors of the router specified by router_name
-    for nhbr in routers[router_name].neighbours:
-        # Acquire the lock for the queue of the neighbor router
-        with routers[nhbr].queue_lock:
-            # Append a message to the neighbor's queue
-            # The message consists of a deepcopy of the routing table of the router_name's router
-            # and the name of the router_name
-            routers[nhbr].queue.append((deepcopy(routers[router_name].table), router_name))
+    for nhbr in router.neighbours:
+        # Store the message in the neighbor's queue, in the slot reserved for router_name
+        routers[nhbr].slots[router.id] = snapshot
+
+# Method to print the iteration number followed by every router, using a single write to stdout
+def print_routers(itr):
+    header = f'\n******** Iteration {itr} *********\n\n'
+    sys.stdout.write(header + "".join(f'{key} => {value}\n\n' for key, value in routers.items()))
 
 # Map containing name of router as key and the router object as value
 routers = dict()
 
+# Number of iterations of updation to run
+NO_OF_ITERATIONS = 4
+
+# Largest allowed sum of all link costs in the input file
+# Every cost a router computes is at most twice this sum, so it stays below 2**53 and is exact as a double
+MAX_TOTAL_COST = 2 ** 52
+
+# List of (router name, router id) pairs in sorted order of name, used when printing routing tables
+# Filled in once by input_parser
+ROUTERS_SORTED = []
+
 # Main function
 if __name__ == '__main__':
     try:
@@ -173,21 +224,33 @@ if __name__ == '__main__':
         input_parser(filename)
 
         # Printing routers before updation
-        print(f'\n******** Iteration 0 *********\n')
-        for key, value in routers.items():
-            print(f'{key} => {value}\n')
+        print_routers(0)
 
         
-        # Printing 4 iterations of updation
-        for itr in range(1, 5):
-            threads = []
-            for router_name in routers:
-                thread = threading.Thread(target = threaded, args = (router_name, ))
-                threads.append(thread)
-                thread.start()
-            for thread in threads:
-                thread.join()
-            
-            print(f'\n******** Iteration {itr} *********\n')
-            for key, value in routers.items():
-                print(f'{key} => {value}\n')
\ No newline at end of file
+        # Barriers shared by all router threads and the main thread
+        # posted releases everyone once each router has posted its table,
+        # updated releases everyone once each router has updated its table
+        posted = threading.Barrier(len(routers) + 1)
+        updated = threading.Barrier(len(routers) + 1)
+
+        # Create one thread per router, it runs all iterations of updation
+        threads = []
+        for router_name in routers:
+            thread = threading.Thread(target = threaded, args = (router_name, posted, updated), daemon = True)
+            threads.append(thread)
+            thread.start()
+
+        # Printing iterations of updation
+        try:
+            for itr in range(1, NO_OF_ITERATIONS + 1):
+                posted.wait()
+                updated.wait()
+                print_routers(itr)
+        except BaseException:
+            # Abort both barriers so the router threads stop instead of waiting for the main thread
+            posted.abort()
+            updated.abort()
+            raise
+
+        for thread in threads:
+            thread.join()
\ No newline at end of file